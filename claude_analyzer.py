@@ -3,106 +3,178 @@
 Claude Code integration for GitDigest analysis
 """
 
-import json
-import subprocess
+import asyncio
 import logging
+import shutil
+import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional
+
+from digest_data import has_pull_requests
+
+# Linux caps pipe buffers for unprivileged processes at 1 MiB by default
+MAX_PIPE_SIZE = 1024 * 1024
+
+# Analysis prompts are fixed text, so build them once at import
+MANAGER_ANALYSIS_PROMPT = """I am an engineering manager. Can you read the data and give me a summary of what would be important for me to help with?
+Most important to me:
+- Inconsistent review participation across team
+- Lack of clear PR descriptions or context
+- Unproductive disagreements in reviews
+- Team member struggling with a specific concept
+Always include the PR numbers and links where relevant."""
+
+ENGINEER_ANALYSIS_PROMPT = """I am an a software engineer. Can you read my team's github activity in the data file and give me a prioritized list of what I should review?
+Rank by impact and urgency.
+
+For each action, provide:
+- Specific PR numbers to review, with links to the PR
+- Why this matters technically (not just process)
+- Time estimate for providing this review
+- Any blockers or dependencies"""
+
+
+@lru_cache(maxsize=None)
+def find_claude_cli() -> Optional[str]:
+    """Locate the claude executable once per process"""
+    return shutil.which('claude')
 
 
 class ClaudeAnalyzer:
     """Handle Claude Code integration for digest generation"""
     
-    def __init__(self, data_file: Path, output_file: Path, digest_type: str = "manager"):
+    def __init__(self, data_file: Path, output_file: Path, digest_type: str = "manager",
+                 data: Optional[Dict[Any, Any]] = None):
         self.data_file = data_file
         self.output_file = output_file
         self.digest_type = digest_type
+        self.data = data  # already parsed contents of data_file, if the caller has them
     
     def generate_digest(self) -> bool:
         """Generate digest using Claude Code"""
+        return generate_digests([self])[0]
+    
+    async def _analyze(self, claude_cli: str) -> Optional[str]:
+        """Run Claude on the data file and return its insight, "" if skipped, or None on failure"""
+        # Nothing for Claude to say on a day without PRs
+        if self.data is not None:
+            has_prs = bool(self.data.get('pull_requests'))
+        else:
+            has_prs = has_pull_requests(self.data_file)
+        if not has_prs:
+            logging.info("No pull requests found, skipped Claude analysis")
+            return ""
+        
+        # The data file is already JSON, so send its bytes verbatim
+        raw = self.data_file.read_bytes()
+        
+        # Create the prompt based on digest type
+        if self.digest_type == "engineer":
+            prompt = self._create_engineer_analysis_prompt()
+        else:
+            prompt = self._create_manager_analysis_prompt()
+        payload = f"{prompt}\n\nAnalyze this data:\n".encode() + raw
+        
+        # Send bytes straight to the pipe, sized to the payload where supported
+        popen_kwargs = {}
+        if sys.version_info >= (3, 10):
+            popen_kwargs['pipesize'] = min(max(65536, len(payload)), MAX_PIPE_SIZE)
+        
+        process = await asyncio.create_subprocess_exec(
+            claude_cli,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            **popen_kwargs
+        )
+        
         try:
-            # Load the data to get some context
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-            
-            # Create the prompt based on digest type
-            if self.digest_type == "engineer":
-                prompt = self._create_engineer_analysis_prompt(data)
-            else:
-                prompt = self._create_manager_analysis_prompt(data)
-            full_prompt = f"{prompt}\n\nAnalyze this data:\n{json.dumps(data, indent=2)}"
-            
-            try:
-                # Use Popen with stdin/pipe interface
-                process = subprocess.Popen(
-                    ['claude'],
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-                
-                stdout, stderr = process.communicate(input=full_prompt, timeout=60)  # 1 minute timeout
-                
-                if process.returncode == 0 and stdout.strip():
-                    # Write Claude's output to the digest file
-                    with open(self.output_file, 'a') as f:
-                        f.write(f"\n\n## 🧠 AI Insight for {self.digest_type}\n{stdout.strip()}\n")
-                    
-                    logging.info("Claude analysis completed successfully")
-                    return True
-                else:
-                    logging.error(f"Claude command failed. Return code: {process.returncode}, Error: {stderr}")
-                    return False
-                    
-            except subprocess.TimeoutExpired:
-                logging.warning("Claude command timed out")
-                process.kill()
-                return False
-                
-        except Exception as e:
-            logging.error(f"Failed to generate digest: {e}")
-            return False
+            stdout, stderr = await asyncio.wait_for(process.communicate(payload), timeout=60)  # 1 minute timeout
+        except asyncio.TimeoutError:
+            logging.warning(f"Claude command timed out for {self.digest_type} analysis")
+            process.kill()
+            await process.wait()
+            return None
+        
+        insight = stdout.decode(errors='replace').strip()
+        if process.returncode == 0 and insight:
+            logging.info(f"Claude {self.digest_type} analysis completed successfully")
+            return insight
+        
+        logging.error(f"Claude command failed. Return code: {process.returncode}, Error: {stderr.decode(errors='replace')}")
+        return None
     
-    def _create_manager_analysis_prompt(self, data: Dict[Any, Any]) -> str:
-        prompt = f"""I am an engineering manager. Can you read the data and give me a summary of what would be important for me to help with?
-        Most important to me:
-        - Inconsistent review participation across team
-        - Lack of clear PR descriptions or context
-        - Unproductive disagreements in reviews
-        - Team member struggling with a specific concept
-        Always include the PR numbers and links where relevant."""
-        return prompt
-
-    def _create_engineer_analysis_prompt(self, data: Dict[Any, Any]) -> str:
-        prompt = f"""I am an a software engineer. Can you read my team's github activity in the data file and give me a prioritized list of what I should review?
-        Rank by impact and urgency.
-
-        For each action, provide:
-        - Specific PR numbers to review, with links to the PR
-        - Why this matters technically (not just process)
-        - Time estimate for providing this review
-        - Any blockers or dependencies"""
-        return prompt
+    def _format_insight(self, insight: str) -> str:
+        return f"\n\n## 🧠 AI Insight for {self.digest_type}\n{insight}\n"
+    
+    def _create_manager_analysis_prompt(self) -> str:
+        return MANAGER_ANALYSIS_PROMPT
+
+    def _create_engineer_analysis_prompt(self) -> str:
+        return ENGINEER_ANALYSIS_PROMPT
+
+
+def append_to_file(output_file: Path, text: str):
+    """Append text with one write, replacing the file atomically via a temp file"""
+    existing = output_file.read_text() if output_file.exists() else ""
+    tmp_file = output_file.with_suffix('.tmp')
+    tmp_file.write_text(existing + text)
+    tmp_file.replace(output_file)
+
+
+def generate_digests(analyzers: List[ClaudeAnalyzer]) -> List[bool]:
+    """Run several Claude analyses concurrently and append each insight in order"""
+    claude_cli = find_claude_cli()
+    if claude_cli is None:
+        logging.error("Claude Code not found. Please install Claude Code CLI first.")
+        return [False] * len(analyzers)
+    
+    async def run_all():
+        return await asyncio.gather(*(analyzer._analyze(claude_cli) for analyzer in analyzers),
+                                    return_exceptions=True)
+    
+    results = []
+    sections = {}  # output_file -> (result indexes, insight sections)
+    for i, (analyzer, insight) in enumerate(zip(analyzers, asyncio.run(run_all()))):
+        if isinstance(insight, Exception):
+            logging.error(f"Failed to generate digest: {insight}")
+            insight = None
+        results.append(insight is not None)
+        if insight:  # skipped analyses add no section
+            indexes, texts = sections.setdefault(analyzer.output_file, ([], []))
+            indexes.append(i)
+            texts.append(analyzer._format_insight(insight))
+    
+    # Write each digest file once, however many analyses target it
+    for output_file, (indexes, texts) in sections.items():
+        try:
+            append_to_file(output_file, "".join(texts))
+        except OSError as e:
+            logging.error(f"Failed to generate digest: {e}")
+            for i in indexes:
+                results[i] = False
+    return results
+
 
 def main():
     """Standalone analyzer for testing"""
-    import sys
     if len(sys.argv) < 3 or len(sys.argv) > 4:
         print("Usage: python claude_analyzer.py <data_file> <output_file> [digest_type]")
-        print("  digest_type: 'manager' (default) or 'engineer'")
+        print("  digest_type: 'manager' (default), 'engineer' or 'both'")
         sys.exit(1)
     
     data_file = Path(sys.argv[1])
     output_file = Path(sys.argv[2])
     digest_type = sys.argv[3] if len(sys.argv) == 4 else "manager"
     
-    if digest_type not in ["manager", "engineer"]:
-        print("Error: digest_type must be 'manager' or 'engineer'")
+    if digest_type not in ["manager", "engineer", "both"]:
+        print("Error: digest_type must be 'manager', 'engineer' or 'both'")
         sys.exit(1)
     
-    analyzer = ClaudeAnalyzer(data_file, output_file, digest_type)
-    success = analyzer.generate_digest()
+    digest_types = ["manager", "engineer"] if digest_type == "both" else [digest_type]
+    analyzers = [ClaudeAnalyzer(data_file, output_file, t) for t in digest_types]
+    success = all(generate_digests(analyzers))
     
     if success:
         print(f"{digest_type.title()} digest generated successfully: {output_file}")
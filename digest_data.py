@@ -0,0 +1,160 @@
+"""
+Loading of collected GitDigest data files
+Parsed data is cached on disk so repeated runs over the same file skip JSON parsing
+"""
+
+import hashlib
+import logging
+import pickle
+import time
+from pathlib import Path
+from sys import intern
+from typing import Dict, Any, Iterable
+
+import ijson
+import orjson
+
+
+CACHE_DIR = Path.home() / ".cache" / "gitdigest"
+# Cached copies not written for this long are removed when a new one is stored
+CACHE_MAX_AGE_DAYS = 30
+
+# Low-cardinality PR fields that repeat across every PR in a digest
+INTERNED_PR_FIELDS = ('status', 'author', 'repo', 'team_involvement')
+
+
+def loads(raw: bytes) -> Any:
+    """Parse JSON bytes"""
+    return orjson.loads(raw)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to indented JSON bytes"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+
+def write_digest_data(data: Dict[Any, Any], data_file: Path):
+    """Write a data file one PR at a time, byte for byte as dumps(data) would"""
+    with open(data_file, 'wb') as f:
+        f.write(b'{')
+        for i, (key, value) in enumerate(data.items()):
+            f.write(b',\n  ' if i else b'\n  ')
+            f.write(dumps(key) + b': ')
+            if key == 'pull_requests' and value:
+                f.write(b'[')
+                for j, pr in enumerate(value):
+                    f.write(b',\n    ' if j else b'\n    ')
+                    f.write(dumps(pr).replace(b'\n', b'\n    '))
+                f.write(b'\n  ]')
+            else:
+                f.write(dumps(value).replace(b'\n', b'\n  '))
+        f.write(b'\n}' if data else b'}')
+
+
+def write_digest(parts: Iterable[str], digest_file: Path):
+    """Write a digest through a temporary file, so a failure never leaves a partial one"""
+    tmp_file = digest_file.with_suffix('.tmp')
+    with open(tmp_file, 'w', buffering=1 << 16) as f:
+        f.writelines(parts)
+    tmp_file.replace(digest_file)
+
+
+def intern_pr_fields(data: Dict[Any, Any]) -> Dict[Any, Any]:
+    """Collapse repeated PR field values to a single shared string each"""
+    for pr in data.get('pull_requests', ()):
+        for field in INTERNED_PR_FIELDS:
+            value = pr.get(field)
+            if isinstance(value, str):
+                pr[field] = intern(value)
+    return data
+
+
+def stream_digest_data(f) -> Dict[Any, Any]:
+    """Read the digest data from a binary file, streaming the pull requests"""
+    data = {}
+    # Only the fields ahead of `pull_requests` are parsed here, which is where the
+    # collector writes them; fields after it (summary_stats) are not read
+    events = ijson.parse(f, use_float=True)
+    for prefix, event, key in events:
+        if prefix != '' or event != 'map_key':
+            continue
+        if key == 'pull_requests':
+            break
+        builder, depth = ijson.ObjectBuilder(), 0
+        for _, event, value in events:
+            builder.event(event, value)
+            depth += event in ('start_map', 'start_array')
+            depth -= event in ('end_map', 'end_array')
+            if not depth:
+                break
+        data[key] = builder.value
+
+    # items() filters in C when reading the file itself, unlike when fed parse events
+    f.seek(0)
+    data['pull_requests'] = ijson.items(f, 'pull_requests.item', use_float=True)
+    return data
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _cache_file(data_file: Path) -> Path:
+    """Cache location keyed by the data file's path, mtime and size"""
+    st = data_file.stat()
+    # The name starts with a hash of the path alone, so stale copies of the same file can be found
+    return CACHE_DIR / f"{_digest(str(data_file.resolve()))}-{_digest(f'{st.st_mtime_ns}:{st.st_size}')}.pkl"
+
+
+def _prune_cache(cache_file: Path):
+    """Remove entries for older versions of the same data file and anything past CACHE_MAX_AGE_DAYS"""
+    path_prefix = cache_file.name.split('-', 1)[0] + '-'
+    cutoff = time.time() - CACHE_MAX_AGE_DAYS * 86400
+    for entry in CACHE_DIR.iterdir():
+        if entry.stem == cache_file.stem:
+            continue
+        try:
+            if entry.name.startswith(path_prefix) or entry.stat().st_mtime < cutoff:
+                entry.unlink()
+        except OSError as e:
+            logging.warning(f"Could not remove data cache {entry}: {e}")
+
+
+def load_digest_data(data_file: Path) -> Dict[Any, Any]:
+    """Load a data file, reusing the parsed copy from an earlier run if unchanged"""
+    cache_file = _cache_file(data_file)
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable data cache {cache_file}: {e}")
+
+    # Pickle keeps the shared strings shared, so cache hits need no interning
+    data = intern_pr_fields(loads(data_file.read_bytes()))
+
+    # Most data files are read once, so the first read only leaves a marker and
+    # the parsed copy is stored when the same file is read again
+    seen_file = cache_file.with_suffix('.seen')
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        if seen_file.exists():
+            tmp_file = cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_file.replace(cache_file)
+            seen_file.unlink()
+        else:
+            seen_file.touch()
+        _prune_cache(cache_file)
+    except OSError as e:
+        logging.warning(f"Could not write data cache {cache_file}: {e}")
+
+    return data
+
+
+def has_pull_requests(data_file: Path) -> bool:
+    """Whether a data file lists any PRs, reading no further than the first one"""
+    with open(data_file, 'rb') as f:
+        return next(ijson.items(f, 'pull_requests.item'), None) is not None
@@ -4,12 +4,25 @@ Engineer-focused digest generator
 Creates a digest focused on what engineers need to review/action
 """
 
-import json
+import re
 import sys
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, List, Any
 
+from digest_data import load_digest_data, stream_digest_data, write_digest
+
+# Smaller data files load faster whole; larger ones are streamed to bound memory
+STREAM_MIN_BYTES = 64 * 1024 * 1024
+
+PRIORITY_LABEL_RE = re.compile(r'priority|critical|urgent')
+
+
+def priority_labels(labels: List[str]) -> List[str]:
+    """Return the labels that mark a PR as high priority"""
+    return [label for label in labels if PRIORITY_LABEL_RE.search(label.lower())]
+
 
 def create_engineer_digest(data: Dict[Any, Any]) -> str:
     """Create an engineer-focused digest from the collected data"""
@@ -20,86 +33,109 @@ def create_engineer_digest(data: Dict[Any, Any]) -> str:
     team_members = data.get('team_members', [])
     repos = data.get('repositories', [])
     prs = data.get('pull_requests', [])
-    stats = data.get('summary_stats', {})
-    
-    # Group PRs by what engineers need to focus on
-    open_prs = [pr for pr in prs if pr['status'] == 'open']
     
-    # PRs that need reviews from team
-    needs_review = []
+    # Group PRs by what engineers need to focus on. Every bucket is filled
+    # in a single pass so `prs` may be a lazy stream rather than a list.
+    team_members_set = set(team_members)
+    open_prs = []
+    merged_prs = []  # Recently merged PRs (good to know what landed)
+    needs_review = []  # PRs that need reviews from team
     my_prs_needing_attention = []
     high_priority = []
+    high_priority_labels = {}  # id(pr) -> matching labels, reused when rendering
+    large_prs = []  # Large PRs that need extra attention
+    getting_stale = []  # PRs approaching staleness
+    repo_breakdown = {}
     
-    for pr in open_prs:
+    for pr in prs:
+        status = pr['status']
+        if status == 'merged':
+            if len(merged_prs) < 10:  # Last 10
+                merged_prs.append(pr)
+            continue
+        if status != 'open':
+            continue
+        
+        open_prs.append(pr)
+        days = pr['days_since_activity']
+        review_count = len(pr.get('reviews') or ())
+        team_involvement = pr.get('team_involvement', '')
+        
         # High priority items
-        if any('priority' in label.lower() or 'critical' in label.lower() or 'urgent' in label.lower() 
-               for label in pr.get('labels', [])):
+        labels = pr.get('labels')
+        hp_labels = priority_labels(labels) if labels else None
+        if hp_labels:
             high_priority.append(pr)
+            high_priority_labels[id(pr)] = hp_labels
         
-        # PRs authored by team that might need reviews
-        if pr.get('author') in team_members:
+        # PRs authored by team that might need reviews (high priority ones are listed separately)
+        ready_for_review = False
+        if not hp_labels and pr.get('author') in team_members_set:
             if not pr.get('is_draft', False):
                 # Check if it has recent reviews or if it's ready for review
-                reviews = pr.get('reviews', [])
-                if len(reviews) == 0 or pr['days_since_activity'] <= 1:
+                if review_count == 0 or days <= 1:
                     needs_review.append(pr)
+                    ready_for_review = True
         
         # PRs where team members have been active (reviews/comments) but might need follow-up
-        if ("reviewer" in pr.get('team_involvement', '') or 
-            "commenter" in pr.get('team_involvement', '')):
+        if "reviewer" in team_involvement or "commenter" in team_involvement:
             # If there's been recent activity and team is involved
-            if pr['days_since_activity'] <= 2:
+            if days <= 2:
                 my_prs_needing_attention.append(pr)
+        
+        if pr.get('files_changed', 0) > 15:
+            large_prs.append(pr)
+        
+        if 5 <= days < 7:
+            getting_stale.append(pr)
+        
+        repo_stats = repo_breakdown.setdefault(pr['repo'], {'total': 0, 'ready_for_review': 0, 'in_review': 0})
+        repo_stats['total'] += 1
+        if ready_for_review:
+            repo_stats['ready_for_review'] += 1
+        elif review_count > 0:
+            repo_stats['in_review'] += 1
     
-    # Remove duplicates
-    needs_review = [pr for pr in needs_review if pr not in high_priority]
-    
-    # Large PRs that need extra attention
-    large_prs = [pr for pr in open_prs if pr.get('files_changed', 0) > 15]
-    
-    # PRs approaching staleness
-    getting_stale = [pr for pr in open_prs if pr['days_since_activity'] >= 5 and pr['days_since_activity'] < 7]
-    
-    # Recently merged PRs (good to know what landed)
-    merged_prs = [pr for pr in prs if pr['status'] == 'merged'][:10]  # Last 10
-
-    # Generate engineer-focused markdown
     team_name = data.get('team_name', 'Team')
-    digest = f"""# {team_name} Development Digest - {date_str}
+    if not open_prs and not merged_prs:
+        return (f"# {team_name} Development Digest - {date_str}\n\n"
+                "✅ No open or recently merged PRs\n"
+                f"\n---\n*Generated at {generated_at} by GitDigest*")
+    
+    # Generate engineer-focused markdown. The f-strings are compiled along with
+    # the module, so there is no template parsing left to cache per run.
+    parts = [f"""# {team_name} Development Digest - {date_str}
 
 ## 🎯 At a Glance
 **{len(open_prs)} open PRs** | **{len(needs_review)} ready for review** | **{len(high_priority)} high priority** | **{len(merged_prs)} recently merged**
 
 ## 🔥 High Priority - Action Needed
 
-"""
+"""]
     
     if high_priority:
         for pr in high_priority[:5]:  # Top 5 high priority
-            labels_str = ", ".join([l for l in pr.get('labels', []) if 'priority' in l.lower() or 'critical' in l.lower() or 'urgent' in l.lower()])
-            digest += f"**[#{pr['number']}]({pr['url']})** `{pr['title']}`  \n"
-            digest += f"📍 **{pr['repo']}** | 👤 @{pr['author']} | ⏱️ {pr['days_since_activity']} days | 🏷️ {labels_str}  \n\n"
+            labels_str = ", ".join(high_priority_labels[id(pr)])
+            parts.append(f"**[#{pr['number']}]({pr['url']})** `{pr['title']}`  \n"
+                         f"📍 **{pr['repo']}** | 👤 @{pr['author']} | ⏱️ {pr['days_since_activity']} days | 🏷️ {labels_str}  \n\n")
     else:
-        digest += "✅ No high priority items\n\n"
+        parts.append("✅ No high priority items\n\n")
     
-    digest += "## 👀 Ready for Review\n\n"
+    parts.append("## 👀 Ready for Review\n\n")
     
     if needs_review:
-        for pr in sorted(needs_review, key=lambda x: x['days_since_activity'], reverse=True):
-            digest += f"**[#{pr['number']}]({pr['url']})** `{pr['title']}`  \n"
-            digest += f"📍 **{pr['repo']}** | 👤 @{pr['author']} | 📁 {pr['files_changed']} files | ⏱️ {pr['days_since_activity']} days  \n"
-            
+        needs_review.sort(key=itemgetter('days_since_activity'), reverse=True)
+        for pr in needs_review:
             # Show if it has any reviews yet
             review_count = len(pr.get('reviews', []))
-            if review_count > 0:
-                digest += f"💬 {review_count} reviews  \n"
-            else:
-                digest += f"🆕 No reviews yet  \n"
-            digest += "\n"
+            review_line = f"💬 {review_count} reviews" if review_count > 0 else "🆕 No reviews yet"
+            parts.append(f"**[#{pr['number']}]({pr['url']})** `{pr['title']}`  \n"
+                         f"📍 **{pr['repo']}** | 👤 @{pr['author']} | 📁 {pr['files_changed']} files | ⏱️ {pr['days_since_activity']} days  \n"
+                         f"{review_line}  \n\n")
     else:
-        digest += "✅ No PRs waiting for review\n\n"
+        parts.append("✅ No PRs waiting for review\n\n")
     
-    digest += "## ⚠️ Needs Attention\n\n"
+    parts.append("## ⚠️ Needs Attention\n\n")
     
     attention_items = []
     
@@ -123,39 +159,27 @@ def create_engineer_digest(data: Dict[Any, Any]) -> str:
             attention_items.append(f"  - [#{pr['number']}]({pr['url']}) `{pr['title']}` - {pr.get('team_involvement', 'unknown')} involvement")
     
     if attention_items:
-        digest += "\n".join(attention_items) + "\n\n"
+        parts.append("\n".join(attention_items) + "\n\n")
     else:
-        digest += "✅ Nothing needs immediate attention\n\n"
+        parts.append("✅ Nothing needs immediate attention\n\n")
     
     # Show what landed recently
     if merged_prs:
-        digest += "## ✅ Recently Shipped\n\n"
+        parts.append("## ✅ Recently Shipped\n\n")
         for pr in merged_prs:
-            digest += f"- **[#{pr['number']}]({pr['url']})** `{pr['title']}` - @{pr['author']}\n"
-        digest += "\n"
+            parts.append(f"- **[#{pr['number']}]({pr['url']})** `{pr['title']}` - @{pr['author']}\n")
+        parts.append("\n")
     
     # Repository-specific view for engineers
-    digest += "## 📊 By Repository\n\n"
-    
-    repo_breakdown = {}
-    for pr in open_prs:
-        repo = pr['repo']
-        if repo not in repo_breakdown:
-            repo_breakdown[repo] = {'total': 0, 'ready_for_review': 0, 'in_review': 0}
-        repo_breakdown[repo]['total'] += 1
-        
-        if pr in needs_review:
-            repo_breakdown[repo]['ready_for_review'] += 1
-        elif len(pr.get('reviews', [])) > 0:
-            repo_breakdown[repo]['in_review'] += 1
+    parts.append("## 📊 By Repository\n\n")
     
     for repo, stats in repo_breakdown.items():
-        digest += f"**{repo}**: {stats['total']} open PRs "
-        digest += f"({stats['ready_for_review']} ready for review, {stats['in_review']} in review)\n"
+        parts.append(f"**{repo}**: {stats['total']} open PRs "
+                     f"({stats['ready_for_review']} ready for review, {stats['in_review']} in review)\n")
     
-    digest += f"\n---\n*Generated at {generated_at} by GitDigest*"
+    parts.append(f"\n---\n*Generated at {generated_at} by GitDigest*")
     
-    return digest
+    return "".join(parts)
 
 
 def main():
@@ -171,13 +195,13 @@ def main():
         sys.exit(1)
     
     try:
-        with open(data_file, 'r') as f:
-            data = json.load(f)
-        
-        digest = create_engineer_digest(data)
+        if data_file.stat().st_size < STREAM_MIN_BYTES:
+            digest = create_engineer_digest(load_digest_data(data_file))
+        else:
+            with open(data_file, 'rb') as f:
+                digest = create_engineer_digest(stream_digest_data(f))
         
-        with open(output_file, 'w') as f:
-            f.write(digest)
+        write_digest((digest,), output_file)
         
         print(f"✅ Engineer digest created: {output_file}")
         
@@ -8,13 +8,25 @@ import os
 import sys
 import json
 import logging
+import sqlite3
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, FrozenSet, Iterator, List, Any, Optional, Tuple
 import requests
 import time
-from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dataclasses import dataclass, field
 from pathlib import Path
+from urllib.parse import urlencode
+
+from digest_data import loads, write_digest_data
+
+
+# Upper bound on repositories collected at the same time
+MAX_CONCURRENT_REPOS = 8
 
 
 @dataclass
@@ -32,9 +44,16 @@ class Config:
     api_delay: float = 0.1
     max_retries: int = 3
     per_page: int = 100
+    max_concurrent_requests: int = 8
+    use_graphql: bool = False
     team_name: str = "Team"
     data_filename_template: str = "team-data-{date}.json"
     digest_filename_template: str = "team-digest-{date}.md"
+    # Membership lookups go through this; team_members keeps the configured order
+    team_members_set: FrozenSet[str] = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.team_members_set = frozenset(self.team_members)
     
     @classmethod
     def from_file(cls, config_file: Path = None):
@@ -59,7 +78,9 @@ class Config:
                 '  "github": {\n'
                 '    "api_delay_seconds": 0.1,\n'
                 '    "max_retries": 3,\n'
-                '    "per_page": 100\n'
+                '    "per_page": 100,\n'
+                '    "max_concurrent_requests": 8,\n'
+                '    "use_graphql": false\n'
                 '  }\n'
                 "}\n"
             )
@@ -79,7 +100,7 @@ class Config:
         })
         output_config = config_data.get("output", {"directory": "output"})
         github_config = config_data.get("github", {
-            "api_delay_seconds": 0.1, "max_retries": 3, "per_page": 100
+            "api_delay_seconds": 0.1, "max_retries": 3, "per_page": 100, "max_concurrent_requests": 8
         })
 
         return cls(
@@ -95,17 +116,67 @@ class Config:
             api_delay=github_config.get("api_delay_seconds", 0.1),
             max_retries=github_config.get("max_retries", 3),
             per_page=github_config.get("per_page", 100),
+            max_concurrent_requests=github_config.get("max_concurrent_requests", 8),
+            use_graphql=github_config.get("use_graphql", False),
             team_name=config_data.get("team_name", "Team"),
             data_filename_template=output_config.get("data_filename_template", "team-data-{date}.json"),
             digest_filename_template=output_config.get("digest_filename_template", "team-digest-{date}.md")
         )
 
 
+if sys.version_info >= (3, 11):
+    # fromisoformat accepts the trailing 'Z' natively and is implemented in C
+    parse_gh_timestamp = datetime.fromisoformat
+else:
+    def parse_gh_timestamp(value: str) -> datetime:
+        """Parse a GitHub API timestamp (YYYY-MM-DDTHH:MM:SSZ)"""
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _truncate(text: Optional[str], limit: int) -> str:
+    """Clip a comment or review body to `limit` characters (missing bodies become "")"""
+    if not text:
+        return ""
+    return text if len(text) <= limit else text[:limit]
+
+
 class GitHubAPIError(Exception):
     """Custom exception for GitHub API errors"""
     pass
 
 
+class ResponseCache:
+    """SQLite store of ETags and bodies, so unchanged responses come back as 304s"""
+    
+    def __init__(self, path: Path, max_age_days: int):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, etag TEXT NOT NULL, body BLOB NOT NULL, stored_at REAL NOT NULL)"
+            )
+            # Bound growth: anything untouched for a whole activity window is dropped
+            self.conn.execute("DELETE FROM responses WHERE stored_at < ?",
+                              (time.time() - max_age_days * 86400,))
+    
+    @staticmethod
+    def key(url: str, params: Optional[Dict]) -> str:
+        """Cache key for a GET request"""
+        return f"{url}?{urlencode(sorted(params.items()))}" if params else url
+    
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """The stored (etag, body) for a key, if any"""
+        with self.lock:
+            return self.conn.execute("SELECT etag, body FROM responses WHERE key = ?", (key,)).fetchone()
+    
+    def put(self, key: str, etag: str, body: bytes):
+        """Store or refresh a response"""
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                              (key, etag, body, time.time()))
+
+
 class GitHubClient:
     """GitHub API client with rate limiting and pagination support"""
     
@@ -118,27 +189,86 @@ class GitHubClient:
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28"
         })
+        max_retries = config.max_retries if config else 3
+        max_concurrent = config.max_concurrent_requests if config else 8
+        # Transient server errors are retried by urllib3; rate limits (403/429, including
+        # their Retry-After hints) are only handled in _make_request.
+        # Each PR worker also fetches reviews on a second thread, hence the doubled pool,
+        # plus one connection per concurrently collected repository.
+        retry = Retry(total=max_retries, backoff_factor=1.0, status_forcelist=[500, 502, 503, 504],
+                      allowed_methods=["GET"], respect_retry_after_header=False, raise_on_status=False)
+        self.session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=2 * max_concurrent + MAX_CONCURRENT_REPOS,
+                                                   max_retries=retry))
         self.base_url = "https://api.github.com"
-        
-    def _make_request(self, url: str, params: Optional[Dict] = None) -> requests.Response:
-        """Make a request with rate limit handling"""
-        response = self.session.get(url, params=params)
-        
-        if response.status_code == 403 and "rate limit" in response.text.lower():
-            reset_time = int(response.headers.get("X-RateLimit-Reset", time.time() + 3600))
-            wait_time = max(reset_time - int(time.time()) + 10, 60)
+        # Conditional request cache, enabled once the output directory exists
+        self.cache: Optional[ResponseCache] = None
+        
+    def _make_request(self, url: str, params: Optional[Dict] = None,
+                      payload: Optional[Dict] = None) -> Any:
+        """Make a request (a JSON POST if `payload` is given) with rate limit handling and return the parsed body"""
+        cache_key = cached = None
+        if self.cache and payload is None:
+            cache_key = self.cache.key(url, params)
+            cached = self.cache.get(cache_key)
+        
+        def send() -> requests.Response:
+            if payload is not None:
+                return self.session.post(url, json=payload)
+            headers = {"If-None-Match": cached[0]} if cached else None
+            return self.session.get(url, params=params, headers=headers)
+        
+        max_retries = self.config.max_retries if self.config else 3
+        response = send()
+        
+        for attempt in range(max_retries):
+            if not self._is_rate_limited(response):
+                break
+            wait_time = self._rate_limit_wait(response, attempt)
             logging.warning(f"Rate limit exceeded. Waiting {wait_time} seconds...")
             time.sleep(wait_time)
-            response = self.session.get(url, params=params)
+            response = send()
         
-        if response.status_code != 200:
+        if response.status_code == 304 and cached:
+            # Not modified: serve the stored body (304s don't count against the rate limit)
+            self.cache.put(cache_key, *cached)
+            return loads(cached[1])
+        
+        if not response.ok:
             raise GitHubAPIError(f"GitHub API error: {response.status_code} - {response.text}")
         
-        return response
+        if cache_key and "ETag" in response.headers:
+            self.cache.put(cache_key, response.headers["ETag"], response.content)
+        
+        return loads(response.content)
+    
+    @staticmethod
+    def _is_rate_limited(response: requests.Response) -> bool:
+        """Primary (403 + X-RateLimit-Remaining: 0) or secondary (429 / Retry-After) limits"""
+        if response.status_code == 429:
+            return True
+        return response.status_code == 403 and (
+            response.headers.get("X-RateLimit-Remaining") == "0"
+            or "Retry-After" in response.headers
+            or "rate limit" in response.text.lower()
+        )
+    
+    @staticmethod
+    def _rate_limit_wait(response: requests.Response, attempt: int) -> int:
+        """Seconds to wait before retrying a rate limited request"""
+        if "Retry-After" in response.headers:
+            return int(response.headers["Retry-After"])
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset_time = int(response.headers.get("X-RateLimit-Reset", time.time() + 3600))
+            return max(reset_time - int(time.time()) + 10, 60)
+        # Secondary limits without a hint: back off exponentially from one minute
+        return 60 * 2 ** attempt
     
     def get_paginated_data(self, url: str, params: Optional[Dict] = None) -> List[Dict]:
         """Fetch all pages of data from a paginated endpoint"""
-        all_data = []
+        return list(self.iter_paginated(url, params))
+    
+    def iter_paginated(self, url: str, params: Optional[Dict] = None) -> Iterator[Dict]:
+        """Yield items from a paginated endpoint, fetching each page only when it is reached"""
         page = 1
         params = params or {}
         per_page = self.config.per_page if self.config else 100
@@ -148,27 +278,23 @@ class GitHubClient:
             params['page'] = page
             params['per_page'] = per_page
             
-            response = self._make_request(url, params)
-            data = response.json()
+            data = self._make_request(url, params)
             
             if not data or len(data) == 0:
                 break
                 
-            all_data.extend(data)
+            yield from data
             
             if len(data) < per_page:
                 break
                 
             page += 1
             time.sleep(api_delay)
-            
-        return all_data
     
     def validate_token(self) -> bool:
         """Validate GitHub token and permissions"""
         try:
-            response = self._make_request(f"{self.base_url}/user")
-            user_data = response.json()
+            user_data = self._make_request(f"{self.base_url}/user")
             logging.info(f"Authenticated as: {user_data.get('login')}")
             return True
         except GitHubAPIError as e:
@@ -176,6 +302,60 @@ class GitHubClient:
             return False
 
 
+class GraphQLClient:
+    """GitHub GraphQL (v4) client fetching PRs together with their comments, reviews and files"""
+    
+    PULL_REQUESTS_QUERY = """
+    query($owner: String!, $name: String!, $cursor: String, $maxFiles: Int!) {
+      repository(owner: $owner, name: $name) {
+        pullRequests(first: 50, after: $cursor, orderBy: {field: UPDATED_AT, direction: DESC}) {
+          pageInfo { hasNextPage endCursor }
+          nodes {
+            number title url state isDraft createdAt updatedAt mergedAt changedFiles
+            author { login }
+            labels(first: 20) { nodes { name } }
+            assignees(first: 20) { nodes { login } }
+            comments(last: 100) { nodes { author { login } body createdAt updatedAt url } }
+            reviews(last: 100) { nodes { author { login } state body submittedAt url } }
+            files(first: $maxFiles) { nodes { path } }
+          }
+        }
+      }
+    }
+    """
+    
+    def __init__(self, github: GitHubClient, config: Config):
+        self.github = github
+        self.config = config
+    
+    def query(self, query: str, variables: Dict) -> Dict:
+        """Run a GraphQL query and return its data"""
+        result = self.github._make_request(
+            f"{self.github.base_url}/graphql", payload={"query": query, "variables": variables}
+        )
+        if result.get("errors"):
+            raise GitHubAPIError(f"GitHub GraphQL error: {result['errors']}")
+        return result["data"]
+    
+    def fetch_prs(self, repo: str, since: datetime) -> Iterator[Dict]:
+        """Yield PR nodes for a repository, most recently updated first, until `since`"""
+        owner, name = repo.split('/', 1)
+        cursor = None
+        while True:
+            data = self.query(self.PULL_REQUESTS_QUERY, {
+                "owner": owner, "name": name, "cursor": cursor, "maxFiles": self.config.max_key_files
+            })
+            pull_requests = data["repository"]["pullRequests"]
+            for node in pull_requests["nodes"]:
+                if parse_gh_timestamp(node['updatedAt']) < since:
+                    return
+                yield node
+            if not pull_requests["pageInfo"]["hasNextPage"]:
+                return
+            cursor = pull_requests["pageInfo"]["endCursor"]
+            time.sleep(self.config.api_delay)
+
+
 class GitDigestCollector:
     """Main data collection class"""
     
@@ -186,6 +366,17 @@ class GitDigestCollector:
         now_utc = datetime.now(timezone.utc)
         self.cutoff_date = now_utc - timedelta(days=config.activity_days)
         self.merge_cutoff_date = now_utc - timedelta(days=config.recent_merge_days)
+        # Comments updated before this are outside the activity window. Day precision
+        # keeps the REST request (and its cached ETag) stable across runs.
+        self.comments_since = self.cutoff_date.strftime('%Y-%m-%dT00:00:00Z')
+        # PRs are processed concurrently, with each one's reviews loading alongside its
+        # comments; both pools only exist while collect_all_data runs
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.review_executor: Optional[ThreadPoolExecutor] = None
+        self.graphql = GraphQLClient(self.github, config) if config.use_graphql else None
+        # Per-run results of the search API (30 requests/minute) and recent PR scans
+        self._search_cache: Dict[Tuple[str, str, str], List[Dict]] = {}
+        self._recent_cache: Dict[Tuple[str, int], List[Dict]] = {}
         
     def setup_logging(self):
         """Configure logging"""
@@ -201,58 +392,109 @@ class GitDigestCollector:
     
     def collect_pr_data(self, repo: str) -> List[Dict]:
         """Collect PR data for a repository with smart filtering"""
+        if self.graphql:
+            return self.collect_pr_data_graphql(repo)
+        
         logging.info(f"Collecting PR data for {repo}")
         
-        relevant_prs = []
+        # PRs found by both strategies are kept once, in first-seen order
+        prs_by_number: Dict[int, Dict] = {}
         
         # Strategy 1: Get PRs authored by team members (most efficient)
         for member in self.config.team_members:
             logging.info(f"Fetching PRs authored by {member} in {repo}")
-            member_prs = self.get_prs_by_author(repo, member)
-            relevant_prs.extend(member_prs)
+            for pr in self.get_prs_by_author(repo, member):
+                prs_by_number.setdefault(pr['number'], pr)
         
         # Strategy 2: Get recently updated PRs for review involvement
         # Only get last 20-30 PRs to check for team reviews/comments
         logging.info(f"Fetching recently updated PRs in {repo} for team involvement")
-        recent_prs = self.get_recent_prs_for_team_involvement(repo, limit=30)
-        relevant_prs.extend(recent_prs)
-        
-        # Remove duplicates based on PR number
-        seen_prs = set()
-        unique_prs = []
-        for pr in relevant_prs:
-            if pr['number'] not in seen_prs:
-                seen_prs.add(pr['number'])
-                unique_prs.append(pr)
+        for pr in self.get_recent_prs_for_team_involvement(repo, limit=30):
+            prs_by_number.setdefault(pr['number'], pr)
         
+        unique_prs = list(prs_by_number.values())
         logging.info(f"Found {len(unique_prs)} relevant PRs in {repo}")
         return unique_prs
     
+    def collect_pr_data_graphql(self, repo: str) -> List[Dict]:
+        """Collect PR data for a repository with one GraphQL query per page of PRs"""
+        logging.info(f"Collecting PR data for {repo} via GraphQL")
+        
+        # Every PR updated since the cutoff arrives with its comments, reviews
+        # and files, so team involvement is checked without further requests
+        relevant_prs = []
+        since = min(self.cutoff_date, self.merge_cutoff_date)
+        for node in self.graphql.fetch_prs(repo, since):
+            if not node['author']:
+                logging.warning(f"PR #{node['number']} in {repo} has no author information, skipping")
+                continue
+            pr = {
+                "number": node['number'],
+                "title": node['title'],
+                "html_url": node['url'],
+                "user": {"login": node['author']['login']},
+                "state": "open" if node['state'] == "OPEN" else "closed",
+                "draft": node['isDraft'],
+                "created_at": node['createdAt'],
+                "updated_at": node['updatedAt'],
+                "merged_at": node['mergedAt'],
+                "labels": node['labels']['nodes'],
+                "assignees": node['assignees']['nodes'],
+            }
+            comments = [{
+                "author": comment['author']['login'],
+                "body": _truncate(comment['body'], self.config.max_comment_length),
+                "created_at": comment['createdAt'],
+                "url": comment['url']
+            } for comment in node['comments']['nodes']
+                if comment['author'] and comment['updatedAt'] >= self.comments_since]
+            reviews = [{
+                "author": review['author']['login'],
+                "state": review['state'],
+                "body": _truncate(review['body'], self.config.max_comment_length),
+                "submitted_at": review['submittedAt'],
+                "url": review['url']
+            } for review in node['reviews']['nodes'] if review['author']]
+            files = node['files']['nodes'] if node['files'] else []
+            record = self.build_pr_record(repo, pr, comments, reviews,
+                                          lambda: (node['changedFiles'], [f['path'] for f in files]))
+            if record:
+                relevant_prs.append(record)
+        
+        logging.info(f"Found {len(relevant_prs)} relevant PRs in {repo}")
+        return relevant_prs
+    
     def get_prs_by_author(self, repo: str, author: str) -> List[Dict]:
         """Get PRs authored by a specific team member"""
+        since = self.cutoff_date.strftime('%Y-%m-%d')
+        cache_key = (repo, author, since)
+        if cache_key in self._search_cache:
+            return self._search_cache[cache_key]
+        
         url = f"{self.github.base_url}/search/issues"
         params = {
-            "q": f"repo:{repo} type:pr author:{author} updated:>={self.cutoff_date.strftime('%Y-%m-%d')}",
+            "q": f"repo:{repo} type:pr author:{author} updated:>={since}",
             "sort": "updated",
             "per_page": 50
         }
         
         try:
-            response = self.github._make_request(url, params)
-            search_results = response.json()
+            search_results = self.github._make_request(url, params)
             
-            prs = []
-            for item in search_results.get('items', []):
-                # Convert search result to PR format by fetching full PR data
-                pr_url = item['pull_request']['url']
-                pr_response = self.github._make_request(pr_url)
-                pr_data = pr_response.json()
-                
-                processed_pr = self.process_pr(repo, pr_data)
-                if processed_pr:
-                    prs.append(processed_pr)
+            def fetch_and_process(item: Dict) -> Optional[Dict]:
+                # Search items carry every field process_pr reads; the full PR is
+                # only fetched when a closed item doesn't say whether it merged
+                merge_info = item['pull_request']
+                if item['state'] == 'open' or 'merged_at' in merge_info:
+                    pr = dict(item, merged_at=merge_info.get('merged_at'), draft=item.get('draft', False))
+                else:
+                    pr = self.github._make_request(merge_info['url'])
+                return self.process_pr(repo, pr)
+            
+            prs = self.process_concurrently(fetch_and_process, search_results.get('items', []))
             
             logging.info(f"Found {len(prs)} PRs authored by {author}")
+            self._search_cache[cache_key] = prs
             return prs
             
         except Exception as e:
@@ -261,6 +503,9 @@ class GitDigestCollector:
     
     def get_recent_prs_for_team_involvement(self, repo: str, limit: int = 30) -> List[Dict]:
         """Get recent PRs to check for team member involvement in reviews/comments"""
+        if (repo, limit) in self._recent_cache:
+            return self._recent_cache[(repo, limit)]
+        
         url = f"{self.github.base_url}/repos/{repo}/pulls"
         params = {
             "state": "all",
@@ -270,32 +515,41 @@ class GitDigestCollector:
         }
         
         try:
-            response = self.github._make_request(url, params)
-            prs = response.json()
+            prs = self.github._make_request(url, params)
             
-            relevant_prs = []
+            candidates = []
             for pr in prs:
                 # Quick date check
-                updated_at = datetime.fromisoformat(pr['updated_at'].replace('Z', '+00:00'))
+                updated_at = parse_gh_timestamp(pr['updated_at'])
                 if updated_at < self.cutoff_date:
                     break
                     
                 # Skip if authored by team member (already got those)
-                if pr.get('user') and pr['user'] and pr['user']['login'] in self.config.team_members:
+                if pr.get('user') and pr['user'] and pr['user']['login'] in self.config.team_members_set:
                     continue
-                    
-                # Check for team involvement
-                pr_data = self.process_pr(repo, pr)
-                if pr_data and ("reviewer" in pr_data['team_involvement'] or "commenter" in pr_data['team_involvement']):
-                    relevant_prs.append(pr_data)
+                
+                candidates.append(pr)
+            
+            # Check for team involvement. Telling commenters apart needs the comments and
+            # telling reviewers apart needs the reviews, so every candidate is fully
+            # processed; files are still only fetched for PRs that turn out relevant
+            relevant_prs = [
+                pr_data for pr_data in self.process_concurrently(lambda pr: self.process_pr(repo, pr), candidates)
+                if "reviewer" in pr_data['team_involvement'] or "commenter" in pr_data['team_involvement']
+            ]
             
             logging.info(f"Found {len(relevant_prs)} PRs with team involvement")
+            self._recent_cache[(repo, limit)] = relevant_prs
             return relevant_prs
             
         except Exception as e:
             logging.warning(f"Failed to get recent PRs: {e}")
             return []
     
+    def process_concurrently(self, func, items: List[Dict]) -> List[Dict]:
+        """Apply func to items on the worker pool, keeping order and dropping None results"""
+        return [result for result in self.executor.map(func, items) if result]
+    
     def is_pr_potentially_relevant(self, pr: Dict) -> bool:
         """Quick check if PR might be relevant before expensive processing"""
         if not pr.get('user') or not pr['user']:
@@ -304,11 +558,11 @@ class GitDigestCollector:
         author = pr['user']['login']
         
         # If authored by team member, definitely relevant
-        if author in self.config.team_members:
+        if author in self.config.team_members_set:
             return True
             
         # For non-team authors, only process if recently active
-        updated_at = datetime.fromisoformat(pr['updated_at'].replace('Z', '+00:00'))
+        updated_at = parse_gh_timestamp(pr['updated_at'])
         if updated_at < self.cutoff_date:
             return False
             
@@ -323,29 +577,25 @@ class GitDigestCollector:
             logging.warning(f"PR #{pr_number} in {repo} has no user data, skipping")
             return None
         
-        author = pr['user']['login']
-        
-        # Check if author is team member
-        is_team_authored = author in self.config.team_members
-        
-        # Get comments and reviews to check team involvement
+        # Get comments and reviews to check team involvement. Comments are
+        # fetched on this thread while reviews load on the review pool.
+        reviews_future = self.review_executor.submit(self.get_pr_reviews, repo, pr_number)
         comments = self.get_pr_comments(repo, pr_number)
-        reviews = self.get_pr_reviews(repo, pr_number)
+        reviews = reviews_future.result()
         
-        team_commenters = set()
-        team_reviewers = set()
+        return self.build_pr_record(repo, pr, comments, reviews,
+                                    lambda: self.get_pr_file_summary(repo, pr_number, pr.get('changed_files')))
+    
+    def build_pr_record(self, repo: str, pr: Dict, comments: List[Dict], reviews: List[Dict],
+                        file_summary: Callable[[], Tuple[int, List[str]]]) -> Optional[Dict]:
+        """Build the digest record for a PR, or None if it is not relevant"""
+        author = pr['user']['login']
         
-        for comment in comments:
-            if comment.get('user') and comment['user']:
-                commenter = comment['user']['login']
-                if commenter in self.config.team_members:
-                    team_commenters.add(commenter)
+        # Check if author is team member
+        is_team_authored = author in self.config.team_members_set
         
-        for review in reviews:
-            if review.get('user') and review['user']:
-                reviewer = review['user']['login']
-                if reviewer in self.config.team_members:
-                    team_reviewers.add(reviewer)
+        team_commenters = {comment['author'] for comment in comments if comment['author'] in self.config.team_members_set}
+        team_reviewers = {review['author'] for review in reviews if review['author'] in self.config.team_members_set}
         
         # Determine team involvement
         team_involvement = []
@@ -361,9 +611,9 @@ class GitDigestCollector:
             return None
         
         # Check if it's a recently merged PR or has recent activity
-        updated_at = datetime.fromisoformat(pr['updated_at'].replace('Z', '+00:00'))
+        updated_at = parse_gh_timestamp(pr['updated_at'])
         is_recently_merged = (pr['state'] == 'closed' and pr['merged_at'] and 
-                             datetime.fromisoformat(pr['merged_at'].replace('Z', '+00:00')) >= self.merge_cutoff_date)
+                             parse_gh_timestamp(pr['merged_at']) >= self.merge_cutoff_date)
         has_recent_activity = updated_at >= self.cutoff_date
         
         if not (is_recently_merged or has_recent_activity):
@@ -373,13 +623,11 @@ class GitDigestCollector:
         days_since_activity = (datetime.now(timezone.utc) - updated_at).days
         
         # Get files changed
-        files_data = self.get_pr_files(repo, pr_number)
-        files_changed = len(files_data)
-        key_files = [f['filename'] for f in files_data[:self.config.max_key_files]]
+        files_changed, key_files = file_summary()
         
         return {
             "repo": repo,
-            "number": pr_number,
+            "number": pr['number'],
             "title": pr['title'],
             "author": author,
             "url": pr['html_url'],
@@ -403,13 +651,14 @@ class GitDigestCollector:
     def get_pr_comments(self, repo: str, pr_number: int) -> List[Dict]:
         """Get comments for a PR"""
         url = f"{self.github.base_url}/repos/{repo}/issues/{pr_number}/comments"
-        comments = self.github.get_paginated_data(url)
+        # Only comments from the activity window matter; let the API drop older ones
+        params = {"since": self.comments_since}
         result = []
-        for comment in comments:
+        for comment in self.github.iter_paginated(url, params):
             if comment.get('user') and comment['user']:
                 result.append({
                     "author": comment['user']['login'],
-                    "body": comment['body'][:self.config.max_comment_length],
+                    "body": _truncate(comment['body'], self.config.max_comment_length),
                     "created_at": comment['created_at'],
                     "url": comment['html_url']
                 })
@@ -419,14 +668,13 @@ class GitDigestCollector:
         """Get reviews for a PR"""
         url = f"{self.github.base_url}/repos/{repo}/pulls/{pr_number}/reviews"
         try:
-            reviews = self.github.get_paginated_data(url)
             result = []
-            for review in reviews:
+            for review in self.github.iter_paginated(url):
                 if review.get('user') and review['user']:
                     result.append({
                         "author": review['user']['login'],
                         "state": review['state'],
-                        "body": review['body'][:self.config.max_comment_length] if review['body'] else "",
+                        "body": _truncate(review['body'], self.config.max_comment_length),
                         "submitted_at": review['submitted_at'],
                         "url": review['html_url']
                     })
@@ -434,29 +682,55 @@ class GitDigestCollector:
         except GitHubAPIError:
             return []
     
-    def get_pr_files(self, repo: str, pr_number: int) -> List[Dict]:
-        """Get files changed in a PR"""
+    def get_pr_file_summary(self, repo: str, pr_number: int,
+                            changed_files: Optional[int] = None) -> Tuple[int, List[str]]:
+        """Get the number of files changed in a PR and the first few filenames"""
         url = f"{self.github.base_url}/repos/{repo}/pulls/{pr_number}/files"
+        # One page of files; a known count needs only the key files, otherwise the PR
+        # itself is fetched only when a full page overflows
+        per_page = self.config.max_key_files if changed_files is not None else self.config.per_page
         try:
-            return self.github.get_paginated_data(url)
+            files_data = self.github._make_request(url, {"per_page": per_page}) if per_page else []
+            if changed_files is None:
+                if len(files_data) < per_page:
+                    changed_files = len(files_data)
+                else:
+                    pr_url = f"{self.github.base_url}/repos/{repo}/pulls/{pr_number}"
+                    changed_files = self.github._make_request(pr_url)['changed_files']
         except GitHubAPIError:
-            return []
+            return changed_files or 0, []
+        return changed_files, [f['filename'] for f in files_data[:self.config.max_key_files]]
     
     def generate_summary_stats(self, all_prs: List[Dict]) -> Dict:
         """Generate summary statistics"""
-        total_active_prs = len(all_prs)
-        team_authored_prs = len([pr for pr in all_prs if "author" in pr['team_involvement']])
-        team_reviewed_prs = len([pr for pr in all_prs if "reviewer" in pr['team_involvement']])
-        stale_prs = len([pr for pr in all_prs if pr['days_since_activity'] > 7 and pr['status'] == 'open'])
+        team_authored_prs = team_reviewed_prs = stale_prs = 0
+        open_prs = merged_prs = draft_prs = 0
+        
+        # One pass over the PRs, counting every statistic as we go
+        for pr in all_prs:
+            involvement = pr['team_involvement']
+            status = pr['status']
+            if "author" in involvement:
+                team_authored_prs += 1
+            if "reviewer" in involvement:
+                team_reviewed_prs += 1
+            if status == 'open':
+                open_prs += 1
+                if pr['days_since_activity'] > 7:
+                    stale_prs += 1
+            elif status == 'merged':
+                merged_prs += 1
+            if pr['is_draft']:
+                draft_prs += 1
         
         return {
-            "total_active_prs": total_active_prs,
+            "total_active_prs": len(all_prs),
             "team_authored_prs": team_authored_prs,
             "team_reviewed_prs": team_reviewed_prs,
             "stale_prs": stale_prs,
-            "open_prs": len([pr for pr in all_prs if pr['status'] == 'open']),
-            "merged_prs": len([pr for pr in all_prs if pr['status'] == 'merged']),
-            "draft_prs": len([pr for pr in all_prs if pr['is_draft']])
+            "open_prs": open_prs,
+            "merged_prs": merged_prs,
+            "draft_prs": draft_prs
         }
     
     def collect_all_data(self) -> Dict:
@@ -466,17 +740,30 @@ class GitDigestCollector:
         
         self.config.output_dir.mkdir(exist_ok=True)
         self.setup_logging()
+        self.github.cache = ResponseCache(self.config.output_dir / ".http-cache.sqlite",
+                                          self.config.activity_days)
         
         logging.info("Starting GitDigest data collection")
         
-        all_prs = []
-        for repo in self.config.repositories:
+        def collect_repo(repo: str) -> List[Dict]:
             try:
-                prs = self.collect_pr_data(repo)
-                all_prs.extend(prs)
+                return self.collect_pr_data(repo)
             except Exception as e:
                 logging.error(f"Failed to collect data for {repo}: {e}")
-                continue
+                return []
+        
+        # Repositories are traversed concurrently; map keeps the configured order
+        all_prs = []
+        self.executor = ThreadPoolExecutor(max_workers=self.config.max_concurrent_requests)
+        self.review_executor = ThreadPoolExecutor(max_workers=self.config.max_concurrent_requests)
+        try:
+            with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_REPOS, len(self.config.repositories)) or 1) as repo_pool:
+                for prs in repo_pool.map(collect_repo, self.config.repositories):
+                    all_prs.extend(prs)
+        finally:
+            self.executor.shutdown()
+            self.review_executor.shutdown()
+            self.executor = self.review_executor = None
         
         summary_stats = self.generate_summary_stats(all_prs)
 
@@ -493,38 +780,46 @@ class GitDigestCollector:
         return result
 
 
+CLAUDE_ANALYSIS_PROMPT = """
+Please analyze the GitHub PR data below and generate a comprehensive daily digest for {team_name}.
+
+Create a well-formatted markdown report that includes:
+
+1. **Executive Summary** - Key metrics and highlights
+2. **Active Pull Requests** - PRs that need attention, grouped by priority
+3. **Team Activity** - What each team member has been working on
+4. **Stale Items** - PRs that haven't had activity recently
+5. **Recent Completions** - Recently merged PRs
+6. **Action Items** - Things that need immediate attention
+
+Focus on actionable insights and highlight blockers or PRs that need reviews.
+Use clear formatting with bullet points, tables where helpful, and emoji indicators for status.
+"""
+
+
 def run_claude_analysis(data_file: Path, output_file: Path, team_name: str = "the team"):
     """Run Claude Code analysis on the collected data"""
     logging.info("Running Claude Code analysis...")
 
-    prompt = f"""
-    Please analyze the GitHub PR data in {data_file} and generate a comprehensive daily digest for {team_name}.
-    
-    Create a well-formatted markdown report that includes:
-    
-    1. **Executive Summary** - Key metrics and highlights
-    2. **Active Pull Requests** - PRs that need attention, grouped by priority
-    3. **Team Activity** - What each team member has been working on
-    4. **Stale Items** - PRs that haven't had activity recently
-    5. **Recent Completions** - Recently merged PRs
-    6. **Action Items** - Things that need immediate attention
-    
-    Focus on actionable insights and highlight blockers or PRs that need reviews.
-    Use clear formatting with bullet points, tables where helpful, and emoji indicators for status.
-    
-    Save the analysis to {output_file}
-    """
+    prompt = CLAUDE_ANALYSIS_PROMPT.format(team_name=team_name)
     
     try:
-        result = subprocess.run([
-            "claude", "code", "--prompt", prompt
-        ], capture_output=True, text=True, check=True)
+        # Pipe the prompt and data over stdin and write the reply ourselves
+        result = subprocess.run(
+            ["claude"],
+            input=f"{prompt}\n\nAnalyze this data:\n".encode() + data_file.read_bytes(),
+            capture_output=True, check=True, timeout=60
+        )
+        output_file.write_bytes(result.stdout)
         
         logging.info(f"Claude analysis completed successfully")
         return True
     except subprocess.CalledProcessError as e:
         logging.error(f"Claude analysis failed: {e}")
-        logging.error(f"Error output: {e.stderr}")
+        logging.error(f"Error output: {e.stderr.decode(errors='replace')}")
+        return False
+    except subprocess.TimeoutExpired:
+        logging.error("Claude analysis timed out")
         return False
     except FileNotFoundError:
         logging.error("Claude Code not found. Please install Claude Code CLI first.")
@@ -549,8 +844,7 @@ def main():
         digest_filename = config.digest_filename_template.format(date=timestamp)
         data_file = config.output_dir / data_filename
 
-        with open(data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        write_digest_data(data, data_file)
 
         print(f"Data collection complete. Saved to: {data_file}")
 
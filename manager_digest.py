@@ -1,89 +1,158 @@
 #!/usr/bin/env python3
 """
 Manual digest generator as fallback when Claude Code is not available
+
+The hot path is dict traversal and markdown string assembly, so it is kept
+fast at the CPython level: one bucketing pass, inverted author/reviewer
+indexes, streamed output and in-process use from run_digest.py. A JIT such
+as Numba does not apply here, since nopython mode cannot compile code over
+label/title strings and nested dicts.
 """
 
-import json
+import heapq
 import sys
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Tuple
+
+from digest_data import load_digest_data, write_digest
+
+
+@lru_cache(maxsize=None)
+def classify_labels(labels: Tuple[str, ...]) -> Tuple[bool, bool]:
+    """(critical/hotfix, priority/critical) flags for a PR's labels"""
+    # One lowercased string, NUL-separated so no match can span two labels
+    labels_blob = "\x00".join(labels).lower()
+    has_critical = 'critical' in labels_blob
+    is_critical = has_critical or 'hotfix' in labels_blob
+    is_priority = has_critical or 'priority' in labels_blob
+    return is_critical, is_priority
 
 
 def create_manual_digest(data: Dict[Any, Any]) -> str:
     """Create a comprehensive digest from the collected data"""
+    return "".join(iter_manual_digest(data))
+
+
+def iter_manual_digest(data: Dict[Any, Any]) -> Iterator[str]:
+    """Yield the digest for the collected data section by section"""
     
     # Extract key information
     generated_at = data.get('generated_at', datetime.now().isoformat())
     date_str = generated_at.split('T')[0]
     team_members = data.get('team_members', [])
+    team_members_set = frozenset(team_members)  # for membership tests; the list keeps output order
     repos = data.get('repositories', [])
     prs = data.get('pull_requests', [])
     stats = data.get('summary_stats', {})
     
-    # Group PRs by status and priority
-    open_prs = [pr for pr in prs if pr['status'] == 'open']
-    merged_prs = [pr for pr in prs if pr['status'] == 'merged']
-    team_authored = [pr for pr in prs if 'author' in pr['team_involvement']]
-    stale_prs = [pr for pr in prs if pr['days_since_activity'] > 7 and pr['status'] == 'open']
-    draft_prs = [pr for pr in prs if pr.get('is_draft', False)]
+    # Group PRs by status and priority, and by repository, in a single pass
+    open_prs = []
+    merged_prs = []
+    team_authored = []
+    stale_prs = []
+    draft_prs = []
     
     # Engineering Manager Analysis
-    critical_prs = [pr for pr in open_prs if any('critical' in label.lower() or 'hotfix' in label.lower() 
-                                                for label in pr.get('labels', []))]
-    large_prs = [pr for pr in open_prs if pr.get('files_changed', 0) > 15]  # Large PRs
-    old_prs = [pr for pr in open_prs if pr['days_since_activity'] >= 3]  # >3 business days
-    review_heavy_prs = [pr for pr in open_prs if len(pr.get('reviews', [])) > 3]  # Lots of back-and-forth
+    critical_prs = []
+    large_prs = []  # Large PRs
+    old_prs = []  # >3 business days
+    review_heavy_prs = []  # Lots of back-and-forth
+    approaching_old = []  # 2 days, about to hit 3
     
     # Priority PRs (has priority labels)
-    priority_prs = [pr for pr in prs if any('priority' in label.lower() or 'critical' in label.lower() 
-                                          for label in pr.get('labels', []))]
+    priority_prs = []
     
-    # Group by repository
     repo_breakdown = {}
-    for pr in prs:
+    repo_open_prs = {}
+    repo_merged_counts = {}
+    
+    # id(pr) -> "[#123](url) `title`", rendered once and reused by every section listing the PR
+    pr_links = {}
+    
+    # Review health and per-member load over open PRs
+    open_days_total = 0
+    author_counts = {}
+    
+    # Who authored, reviewed and commented on what, for the team activity summary.
+    # Reviews and comments are recorded by PR position so each PR counts once per person.
+    authored_by = {}
+    reviewed_by = {}
+    commented_by = {}
+    
+    for index, pr in enumerate(prs):
+        status = pr['status']
+        days = pr['days_since_activity']
         repo = pr['repo']
-        if repo not in repo_breakdown:
-            repo_breakdown[repo] = []
-        repo_breakdown[repo].append(pr)
+        author = pr.get('author')
+        reviews = pr.get('reviews', [])
+        is_critical, is_priority = classify_labels(tuple(pr.get('labels', ())))
+        
+        if status == 'open':
+            open_prs.append(pr)
+            repo_open_prs.setdefault(repo, []).append(pr)
+            open_days_total += days
+            if author in team_members_set:
+                author_counts[author] = author_counts.get(author, 0) + 1
+            if days > 7:
+                stale_prs.append(pr)
+            if is_critical:
+                critical_prs.append(pr)
+            if pr.get('files_changed', 0) > 15:
+                large_prs.append(pr)
+            if days >= 3:
+                old_prs.append(pr)
+            elif days == 2:
+                approaching_old.append(pr)
+            if len(reviews) > 3:
+                review_heavy_prs.append(pr)
+        elif status == 'merged':
+            merged_prs.append(pr)
+            repo_merged_counts[repo] = repo_merged_counts.get(repo, 0) + 1
+        
+        if 'author' in pr['team_involvement']:
+            team_authored.append(pr)
+        if pr.get('is_draft', False):
+            draft_prs.append(pr)
+        if is_priority:
+            priority_prs.append(pr)
+        
+        repo_breakdown.setdefault(repo, []).append(pr)
+        pr_links[id(pr)] = f"[#{pr['number']}]({pr['url']}) `{pr['title']}`"
+        
+        authored_by.setdefault(author, []).append(pr)
+        for review in reviews:
+            if isinstance(review, dict):
+                reviewed_by.setdefault(review.get('author'), set()).add(index)
+        for comment in pr.get('comments', []):
+            if isinstance(comment, dict):
+                commented_by.setdefault(comment.get('author'), set()).add(index)
+    
+    avg_open_days = open_days_total / len(open_prs) if open_prs else 0.0
     
     # Team activity summary
     team_activity = {}
     for member in team_members:
-        authored = [pr for pr in prs if pr.get('author') == member]
-        
-        # Check for reviews and comments more safely
-        reviewed = []
-        commented = []
-        
-        for pr in prs:
-            # Check reviews
-            for review in pr.get('reviews', []):
-                if isinstance(review, dict) and review.get('author') == member:
-                    reviewed.append(pr)
-                    break
-            
-            # Check comments  
-            for comment in pr.get('comments', []):
-                if isinstance(comment, dict) and comment.get('author') == member:
-                    commented.append(pr)
-                    break
+        authored = authored_by.get(member, [])
+        reviewed = len(reviewed_by.get(member, ()))
+        commented = len(commented_by.get(member, ()))
         
         if authored or reviewed or commented:
             team_activity[member] = {
                 'authored': authored,
-                'reviewed': len(reviewed),
-                'commented': len(commented)
+                'reviewed': reviewed,
+                'commented': commented
             }
     
     # Generate markdown with executive summary and manager priorities
     team_name = data.get('team_name', 'Team')
-    digest = f"""# {team_name} Daily Digest - {date_str}
+    yield f"""# {team_name} Daily Digest - {date_str}
 
 ## 📊 Executive Summary
 
 **Team Velocity:** {len(merged_prs)} PRs merged, {len(open_prs)} PRs in progress, {len(draft_prs)} drafts  
-**Review Health:** Avg. {sum(pr['days_since_activity'] for pr in open_prs) / max(len(open_prs), 1):.1f} days since activity  
+**Review Health:** Avg. {avg_open_days:.1f} days since activity  
 **Workload:** {len(large_prs)} large PRs (>15 files), {len(old_prs)} PRs waiting >3 days for review  
 **Team Coverage:** All {len(team_members)} team members have recent activity
 
@@ -97,24 +166,24 @@ def create_manual_digest(data: Dict[Any, Any]) -> str:
         immediate_actions.append("**Critical/Hotfix PRs waiting for review:**")
         for pr in critical_prs[:3]:
             labels_str = ", ".join(pr.get('labels', []))
-            immediate_actions.append(f"  - [#{pr['number']}]({pr['url']}) `{pr['title']}` ({pr['days_since_activity']} days) - Labels: {labels_str}")
+            immediate_actions.append(f"  - {pr_links[id(pr)]} ({pr['days_since_activity']} days) - Labels: {labels_str}")
     
     if old_prs:
         immediate_actions.append(f"**{len(old_prs)} PRs waiting >3 business days for review:**")
-        for pr in sorted(old_prs, key=lambda x: x['days_since_activity'], reverse=True)[:5]:
-            immediate_actions.append(f"  - [#{pr['number']}]({pr['url']}) `{pr['title']}` - @{pr['author']} ({pr['days_since_activity']} days)")
+        for pr in heapq.nlargest(5, old_prs, key=lambda x: x['days_since_activity']):
+            immediate_actions.append(f"  - {pr_links[id(pr)]} - @{pr['author']} ({pr['days_since_activity']} days)")
     
     if review_heavy_prs:
         immediate_actions.append(f"**{len(review_heavy_prs)} PRs with extensive review cycles (potential communication issues):**")
         for pr in review_heavy_prs[:3]:
-            immediate_actions.append(f"  - [#{pr['number']}]({pr['url']}) `{pr['title']}` - {len(pr.get('reviews', []))} reviews, {len(pr.get('comments', []))} comments")
+            immediate_actions.append(f"  - {pr_links[id(pr)]} - {len(pr.get('reviews', []))} reviews, {len(pr.get('comments', []))} comments")
     
     if not immediate_actions:
         immediate_actions.append("✅ **No immediate interventions needed** - team is operating smoothly")
     
-    digest += "\n".join(immediate_actions)
+    yield "\n".join(immediate_actions)
     
-    digest += f"""
+    yield """
 
 ## ⚠️ Monitoring Situations
 
@@ -124,16 +193,10 @@ def create_manual_digest(data: Dict[Any, Any]) -> str:
     
     if large_prs:
         monitoring_items.append(f"**Large PRs requiring careful review ({len(large_prs)} total):**")
-        for pr in sorted(large_prs, key=lambda x: x.get('files_changed', 0), reverse=True)[:5]:
-            monitoring_items.append(f"  - [#{pr['number']}]({pr['url']}) `{pr['title']}` - {pr.get('files_changed', 0)} files changed")
+        for pr in heapq.nlargest(5, large_prs, key=lambda x: x.get('files_changed', 0)):
+            monitoring_items.append(f"  - {pr_links[id(pr)]} - {pr.get('files_changed', 0)} files changed")
 
     # Team members with lots of open PRs (potential overload)
-    author_counts = {}
-    for pr in open_prs:
-        author = pr.get('author')
-        if author in team_members:
-            author_counts[author] = author_counts.get(author, 0) + 1
-
     overloaded_authors = [(author, count) for author, count in author_counts.items() if count >= 3]
     if overloaded_authors:
         if monitoring_items:  # Add blank line if there are previous items
@@ -143,20 +206,19 @@ def create_manual_digest(data: Dict[Any, Any]) -> str:
             monitoring_items.append(f"  - @{author}: {count} open PRs")
     
     # PRs approaching the "old" threshold
-    approaching_old = [pr for pr in open_prs if pr['days_since_activity'] == 2]  # 2 days, about to hit 3
     if approaching_old:
         if monitoring_items:  # Add blank line if there are previous items
             monitoring_items.append("")
         monitoring_items.append(f"**PRs approaching 3-day threshold ({len(approaching_old)} PRs):**")
         for pr in approaching_old[:3]:
-            monitoring_items.append(f"  - [#{pr['number']}]({pr['url']}) `{pr['title']}` - @{pr['author']}")
+            monitoring_items.append(f"  - {pr_links[id(pr)]} - @{pr['author']}")
     
     if not monitoring_items:
         monitoring_items.append("✅ **No monitoring concerns** - PR sizes and timing look healthy")
     
-    digest += "\n".join(monitoring_items)
+    yield "\n".join(monitoring_items)
     
-    digest += "\n\n## 🎯 Key Actions for Engineering Manager\n\n"
+    yield "\n\n## 🎯 Key Actions for Engineering Manager\n\n"
     
     manager_actions = []
     
@@ -194,70 +256,66 @@ def create_manual_digest(data: Dict[Any, Any]) -> str:
     if not (old_prs or critical_prs or review_heavy_prs or large_prs):
         manager_actions.append("✅ **No immediate manager actions needed** - team is self-managing effectively")
     
-    digest += "\n".join(manager_actions)
+    yield "\n".join(manager_actions)
     
-    digest += "\n\n---\n\n## 📋 Detailed PR Status\n"
+    yield "\n\n---\n\n## 📋 Detailed PR Status\n"
     
     if priority_prs:
-        digest += "\n### High Priority PRs:\n"
+        yield "\n### High Priority PRs:\n"
         for pr in priority_prs[:5]:  # Top 5
             labels_str = ", ".join(pr.get('labels', []))
-            digest += f"- **[#{pr['number']}]({pr['url']})** `{pr['title']}`\n"
-            digest += f"  - Author: @{pr['author']} | Days: {pr['days_since_activity']} | Labels: {labels_str}\n"
+            yield (f"- **[#{pr['number']}]({pr['url']})** `{pr['title']}`\n"
+                   f"  - Author: @{pr['author']} | Days: {pr['days_since_activity']} | Labels: {labels_str}\n")
     
     if stale_prs:
-        digest += "\n### Stale PRs (>7 days):\n"
+        yield "\n### Stale PRs (>7 days):\n"
         for pr in stale_prs:
-            digest += f"- **[#{pr['number']}]({pr['url']})** `{pr['title']}` ({pr['days_since_activity']} days)\n"
+            yield f"- **[#{pr['number']}]({pr['url']})** `{pr['title']}` ({pr['days_since_activity']} days)\n"
     
     # Open PRs ready for review
     ready_for_review = [pr for pr in open_prs if not pr.get('is_draft', False) and 'author' in pr['team_involvement']]
     if ready_for_review:
-        digest += "\n## 📋 Ready for Review\n"
+        yield "\n## 📋 Ready for Review\n"
         for pr in ready_for_review:
-            digest += f"- **[#{pr['number']}]({pr['url']})** `{pr['title']}`\n"
-            digest += f"  - Author: @{pr['author']} | Files: {pr['files_changed']} | Days: {pr['days_since_activity']}\n"
+            yield (f"- **[#{pr['number']}]({pr['url']})** `{pr['title']}`\n"
+                   f"  - Author: @{pr['author']} | Files: {pr['files_changed']} | Days: {pr['days_since_activity']}\n")
     
     # Team activity
     if team_activity:
-        digest += "\n## 👥 Team Activity Summary\n"
+        yield "\n## 👥 Team Activity Summary\n"
         for member, activity in team_activity.items():
-            digest += f"\n### @{member}\n"
+            yield f"\n### @{member}\n"
             if activity['authored']:
-                digest += f"- **Authored:** {len(activity['authored'])} PRs\n"
+                yield f"- **Authored:** {len(activity['authored'])} PRs\n"
                 for pr in activity['authored']:
-                    digest += f"  - [#{pr['number']}]({pr['url']}) `{pr['title']}`\n"
+                    yield f"  - {pr_links[id(pr)]}\n"
             if activity['reviewed']:
-                digest += f"- **Reviewed:** {activity['reviewed']} PRs\n"
+                yield f"- **Reviewed:** {activity['reviewed']} PRs\n"
             if activity['commented']:
-                digest += f"- **Commented:** {activity['commented']} PRs\n"
+                yield f"- **Commented:** {activity['commented']} PRs\n"
     
     # Recent completions
     if merged_prs:
-        digest += "\n## ✅ Recent Completions\n"
+        yield "\n## ✅ Recent Completions\n"
         for pr in merged_prs[:10]:  # Last 10
-            digest += f"- **[#{pr['number']}]({pr['url']})** `{pr['title']}`\n"
-            digest += f"  - Author: @{pr['author']} | Merged: {pr.get('merged_at', 'Unknown')}\n"
+            yield (f"- **[#{pr['number']}]({pr['url']})** `{pr['title']}`\n"
+                   f"  - Author: @{pr['author']} | Merged: {pr.get('merged_at', 'Unknown')}\n")
     
     # Repository breakdown
-    digest += "\n## 📊 Repository Breakdown\n"
+    yield "\n## 📊 Repository Breakdown\n"
     for repo, repo_prs in repo_breakdown.items():
-        open_count = len([pr for pr in repo_prs if pr['status'] == 'open'])
-        merged_count = len([pr for pr in repo_prs if pr['status'] == 'merged'])
-        digest += f"\n### {repo} ({len(repo_prs)} PRs)\n"
-        digest += f"- Open: {open_count}, Merged: {merged_count}\n"
+        open_repo_prs = repo_open_prs.get(repo, [])
+        yield (f"\n### {repo} ({len(repo_prs)} PRs)\n"
+               f"- Open: {len(open_repo_prs)}, Merged: {repo_merged_counts.get(repo, 0)}\n")
         
         # Show most active PRs
-        active_prs = sorted([pr for pr in repo_prs if pr['status'] == 'open'], 
-                           key=lambda x: x['days_since_activity'])[:3]
+        active_prs = heapq.nsmallest(3, open_repo_prs, key=lambda x: x['days_since_activity'])
         if active_prs:
-            digest += "- Recent activity:\n"
+            yield "- Recent activity:\n"
             for pr in active_prs:
-                digest += f"  - [#{pr['number']}]({pr['url']}) `{pr['title']}` ({pr['days_since_activity']} days)\n"
+                yield f"  - {pr_links[id(pr)]} ({pr['days_since_activity']} days)\n"
     
-    digest += f"\n---\n*Generated at {generated_at} by GitDigest*"
-    
-    return digest
+    yield f"\n---\n*Generated at {generated_at} by GitDigest*"
 
 
 def main():
@@ -273,13 +331,7 @@ def main():
         sys.exit(1)
     
     try:
-        with open(data_file, 'r') as f:
-            data = json.load(f)
-        
-        digest = create_manual_digest(data)
-        
-        with open(output_file, 'w') as f:
-            f.write(digest)
+        write_digest(iter_manual_digest(load_digest_data(data_file)), output_file)
         
         print(f"✅ Manual digest created: {output_file}")
         
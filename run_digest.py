@@ -5,7 +5,6 @@ Main runner script with configuration file support
 
 import os
 import sys
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -14,6 +13,9 @@ from typing import Dict, Any
 # Import our modules
 from gitdigest import GitDigestCollector, Config
 from claude_analyzer import ClaudeAnalyzer
+from digest_data import write_digest, write_digest_data
+from engineer_digest import create_engineer_digest
+from manager_digest import iter_manual_digest
 
 
 def main():
@@ -60,8 +62,7 @@ def main():
         data_file = config.output_dir / data_filename
         digest_file = config.output_dir / digest_filename
         
-        with open(data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        write_digest_data(data, data_file)
         
         print(f"✅ Data collection complete: {data_file}")
         print(f"📊 Found {data['summary_stats']['total_active_prs']} relevant PRs")
@@ -70,30 +71,25 @@ def main():
         digest_type = config.digest_type
         print(f"📝 Generating {digest_type} digest...")
         
-        if digest_type == "engineer":
-            digest_generator = Path(__file__).parent / "engineer_digest.py"
-        else:  # default to manager
-            digest_generator = Path(__file__).parent / "manager_digest.py"
-        
-        import subprocess
+        # Render in-process from the data we already hold; the manager digest
+        # is streamed to disk section by section
+        digest_generated = False
         try:
-            result = subprocess.run([
-                sys.executable, str(digest_generator),
-                str(data_file), str(digest_file)
-            ], capture_output=True, text=True, timeout=60)  # 60 second timeout for digest generation
-        except subprocess.TimeoutExpired:
-            print("❌ Digest generation timed out")
-            result = None
+            if digest_type == "engineer":
+                write_digest((create_engineer_digest(data),), digest_file)
+            else:  # default to manager
+                write_digest(iter_manual_digest(data), digest_file)
+            digest_generated = True
+        except Exception as e:
+            print(f"❌ Digest generation failed: {e}")
         
-        digest_generated = False
-        if result and result.returncode == 0:
+        if digest_generated:
             print(f"✅ Digest generated: {digest_file}")
-            digest_generated = True
             
             # Add Claude analysis for both digest types
             print("🤖 Adding Claude analysis...")
             try:
-                analyzer = ClaudeAnalyzer(data_file, digest_file, digest_type)
+                analyzer = ClaudeAnalyzer(data_file, digest_file, digest_type, data=data)
                 success = analyzer.generate_digest()
                 
                 if success:
@@ -103,9 +99,6 @@ def main():
                     
             except Exception as e:
                 print(f"⚠️ Claude analysis error: {e}")
-        else:
-            error_msg = result.stderr if result else "Process timed out"
-            print(f"❌ Digest generation failed: {error_msg}")
         
         if digest_generated:
             print("\n🎯 Daily digest is ready!")
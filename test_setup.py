@@ -77,12 +77,24 @@ def test_github_token():
     print("✅ GITHUB_TOKEN is set")
     return True
 
-def test_claude_code():
-    """Test Claude Code CLI"""
+def test_claude_code(handshake=False):
+    """Test Claude Code CLI (handshake=True also runs `claude --version`)"""
+    import shutil
     import subprocess
     
+    # A PATH lookup is enough to report availability without spawning the CLI
+    claude_cli = shutil.which('claude')
+    if not claude_cli:
+        print("⚠️  Claude Code CLI not found - digest generation will be skipped")
+        print("   Install from: https://docs.anthropic.com/en/docs/claude-code")
+        return False
+    
+    if not handshake:
+        print("✅ Claude Code CLI is available")
+        return True
+    
     try:
-        result = subprocess.run(['claude', '--version'], 
+        result = subprocess.run([claude_cli, '--version'], 
                               capture_output=True, text=True, timeout=5)
         if result.returncode == 0:
             print("✅ Claude Code CLI is available")
@@ -90,9 +102,8 @@ def test_claude_code():
         else:
             print("⚠️  Claude Code CLI found but returned error")
             return False
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
-        print("⚠️  Claude Code CLI not found - digest generation will be skipped")
-        print("   Install from: https://docs.anthropic.com/en/docs/claude-code")
+    except (subprocess.TimeoutExpired, OSError):
+        print("⚠️  Claude Code CLI found but did not respond")
         return False
 
 def main():